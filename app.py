@@ -1,90 +1,19 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-
-def load_data(file):
-    try:
-        data = pd.read_excel(file)
-        if "Start_Date_time" not in data.columns:
-            st.error("Required column 'Start_Date_time' not found")
-            return None
-        data["Start_Date_time"] = pd.to_datetime(data["Start_Date_time"], errors="coerce")
-        if data["Start_Date_time"].isna().all():
-            st.error("Could not parse any dates in 'Start_Date_time'")
-            return None
-        return data
-    except Exception as e:
-        st.error(f"Error loading file: {e}")
-        return None
-
-def create_frequency_table(data, period=None, start_period=None, end_period=None, max_upper=10):
-    mask = pd.Series(True, index=data.index)
-    if period:
-        mask &= data["Start_Date_time"].dt.to_period("M").astype(str) == period
-    elif start_period and end_period:
-        periods = data["Start_Date_time"].dt.to_period("M").astype(str)
-        mask &= (periods >= start_period) & (periods <= end_period)
-    
-    data_filtered = data[mask & ~data["Class_Name"].str.contains("Self Practice", case=False, na=False)]
-    
-    booking_frequencies = data_filtered.groupby("Id_Person").size()
-    freq_counts = pd.Series(0, index=range(1, max_upper + 2))
-    freq_counts.update(booking_frequencies.value_counts())
-    
-    table = pd.DataFrame({
-        "Freq": list(range(1, max_upper + 1)) + [f">{max_upper}"],
-        "#Students": [freq_counts[i] if i <= max_upper else freq_counts[max_upper + 1:].sum() 
-                     for i in range(1, max_upper + 2)]
-    })
-    
-    table["#Students"] = table["#Students"].fillna(0).astype(int)
-    table["Cum 1->"] = table["#Students"].cumsum()
-    table["Cum ->End"] = table["#Students"].sum() - table["Cum 1->"] + table["#Students"]
-    
-    def get_student_details(freq):
-        if isinstance(freq, str):
-            mask = booking_frequencies > max_upper
-        else:
-            mask = booking_frequencies == freq
-        
-        student_info = (data_filtered[data_filtered["Id_Person"].isin(booking_frequencies[mask].index)]
-                       .groupby("Id_Person")["FirstName"]
-                       .first())
-        return ", ".join(f"{name} : {id}" for name, id in student_info.items())
-    
-    table["Details"] = [get_student_details(freq) for freq in table["Freq"]]
-    table.index = range(len(table))
-    return table
-
-def plot_histogram(table):
-    fig, ax = plt.subplots(figsize=(6, 4))
-    plt.subplots_adjust(left=0.15)
-    
-    bars = ax.bar(table["Freq"].astype(str), table["#Students"], color='skyblue', edgecolor='black', width=0.7)
+import os
+import re
 
-    student_counts = table.loc[table["Freq"].apply(lambda x: str(x).isdigit()), ["Freq", "#Students"]].copy()
-    student_counts["Freq"] = student_counts["Freq"].astype(int)
-    expanded = student_counts.loc[student_counts.index.repeat(student_counts["#Students"])]
-    mean_val = expanded["Freq"].mean()
-    median_val = expanded["Freq"].median()
-
-    ax.axvline(mean_val, color='red', linestyle='--', linewidth=1, label=f'Mean: {mean_val:.2f}')
-    ax.axvline(median_val, color='green', linestyle='--', linewidth=1, label=f'Median: {median_val:.2f}')
+import streamlit as st
 
-    for bar, count in zip(bars, table["#Students"]):
-        if count > 0:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2, height + 0.5, 
-                   str(count), ha='center', fontsize=8)
+from bookings import (DEFAULT_EXCLUSIONS, INPUT_FORMATS, STAT_PERCENTILES, STUDENT_PAGE_SIZE,
+                      LoadError, bucket_students, compile_exclusions, count_bookings,
+                      create_frequency_table, create_monthly_matrix, get_counts_cache,
+                      get_disk_cache, get_parse_cache, get_table_cache, load_files, month_label)
+from charts import (get_chart_cache, heatmap_chart, histogram_chart, plot_heatmap,
+                    render_histogram_png)
+from dataset import DATASET_DIR, get_dataset
+from exports import MIME_TYPES, students_download, table_download
+from perf import StageTimer, configure_log_sink
 
-    ax.set_xlabel("Frequency of Bookings", fontsize=9)
-    ax.set_ylabel("Number of Students", fontsize=9)
-    ax.set_xticklabels(table["Freq"].astype(str), fontsize=8, rotation=45)
-    ax.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.legend(fontsize=8, loc='upper right')
-    plt.tight_layout()
-    
-    return fig
+CHART_BACKENDS = ["Static", "Interactive"]
 
 def main():
     st.set_page_config(layout="wide")
@@ -106,52 +35,197 @@ def main():
         </style>
     """, unsafe_allow_html=True)
     
-    uploaded_file = st.file_uploader("Choose an Excel file", type="xlsx")
-    if uploaded_file:
-        data = load_data(uploaded_file)
+    with st.sidebar:
+        show_perf = st.checkbox("Performance panel", help="Time each stage of this rerun")
+        log_perf = st.checkbox("Log stage timings", disabled=not show_perf)
+    if log_perf:
+        configure_log_sink(os.environ.get("FRQ_PERF_LOG"))
+    timer = StageTimer(enabled=show_perf, log=log_perf)
+    
+    uploaded_files = st.file_uploader("Choose booking exports", type=INPUT_FORMATS,
+                                      accept_multiple_files=True,
+                                      help="Excel, CSV, Parquet or Feather")
+    col1, col2 = st.columns(2)
+    with col1:
+        all_sheets = st.checkbox("Read all sheets",
+                                 help="Otherwise only the first sheet of each Excel file. "
+                                      "Blank sheets and sheets without booking columns "
+                                      "are skipped")
+    with col2:
+        incremental = st.checkbox(
+            "Incremental dataset",
+            help=f"Append new bookings from uploads to the local dataset in {DATASET_DIR} "
+                 "and report on everything stored there"
+        )
+    if uploaded_files or incremental:
+        data = None
+        if uploaded_files:
+            with timer.stage("load") as record:
+                try:
+                    data = load_files(uploaded_files, sheet_name=None if all_sheets else 0,
+                                      timer=timer)
+                    record["rows"] = len(data)
+                except LoadError as e:
+                    st.error(str(e))
+        if incremental:
+            dataset = get_dataset()
+            if data is not None:
+                try:
+                    with timer.stage("dataset append", rows=len(data)):
+                        summary = dataset.append(data, timer=timer)
+                except LoadError as e:
+                    st.error(str(e))
+                else:
+                    if summary.get("skipped"):
+                        st.caption("This upload is already in the dataset")
+                    else:
+                        st.caption(f"Added {summary['added']:,} new bookings to "
+                                   f"{len(summary['months'])} month(s), skipped "
+                                   f"{summary['duplicates']:,} already stored")
+            with timer.stage("dataset aggregates") as record:
+                data = dataset.aggregates()
+                record["rows"] = len(data)
+            if data.empty:
+                st.info("The dataset is empty; upload an export to start it.")
+                data = None
         if data is not None:
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns(3)
             
             with col1:
-                analysis_type = st.radio("Analysis Type:", ["Monthly", "Range"])
+                analysis_type = st.radio("Analysis Type:", ["Monthly", "Range", "All months"])
             with col2:
                 max_upper = st.number_input("Max Upper Bound:", min_value=1, value=15)
+            with col3:
+                chart_backend = st.radio("Chart:", CHART_BACKENDS,
+                                         help="Interactive charts are drawn in the browser")
+            
+            exclusions = tuple(st.text_area(
+                "Exclude classes matching:",
+                "\n".join(DEFAULT_EXCLUSIONS),
+                help="One case-insensitive regular expression per line"
+            ).splitlines())
+            try:
+                compile_exclusions(exclusions)
+            except re.error as e:
+                st.error(f"Invalid exclusion pattern: {e}")
+                return
             
-            periods = sorted(data["Start_Date_time"].dt.to_period("M").astype(str).unique())
+            periods = data.attrs["months"]
             
-            if analysis_type == "Monthly":
-                period = st.selectbox("Select Period:", periods, label_visibility="collapsed")
-                table = create_frequency_table(data, period=period, max_upper=max_upper)
-                title = f"Booking Frequency Report for {period}"
+            if analysis_type == "All months":
+                with timer.stage("monthly matrix", rows=len(data)):
+                    matrix = create_monthly_matrix(data, max_upper=max_upper, exclusions=exclusions)
+                st.subheader("Booking Frequency by Month")
+                with timer.stage("chart", rows=matrix.size):
+                    if chart_backend == "Interactive":
+                        st.altair_chart(heatmap_chart(matrix), use_container_width=True)
+                    else:
+                        st.pyplot(plot_heatmap(matrix), clear_figure=True)
+                with timer.stage("st.dataframe", rows=len(matrix)):
+                    st.dataframe(matrix, use_container_width=True)
+                table = None
+            elif analysis_type == "Monthly":
+                period = st.selectbox("Select Period:", periods, format_func=month_label,
+                                      label_visibility="collapsed")
+                with timer.stage("frequency table", rows=len(data)):
+                    table = create_frequency_table(data, period=period, max_upper=max_upper,
+                                                   exclusions=exclusions)
+                selection = {"period": period}
+                title = f"Booking Frequency Report for {month_label(period)}"
+                file_stem = f"frequency_{month_label(period)}"
             else:
                 col1, col2 = st.columns(2)
                 with col1:
-                    start_period = st.selectbox("Start Period:", periods)
+                    start_period = st.selectbox("Start Period:", periods, format_func=month_label)
                 with col2:
-                    end_period = st.selectbox("End Period:", periods)
-                table = create_frequency_table(data, start_period=start_period, 
-                                            end_period=end_period, max_upper=max_upper)
-                title = f"Booking Frequency Report from {start_period} to {end_period}"
+                    end_period = st.selectbox("End Period:", periods, format_func=month_label)
+                with timer.stage("frequency table", rows=len(data)):
+                    table = create_frequency_table(data, start_period=start_period, 
+                                                end_period=end_period, max_upper=max_upper,
+                                                exclusions=exclusions)
+                selection = {"start_period": start_period, "end_period": end_period}
+                title = (f"Booking Frequency Report from {month_label(start_period)} "
+                         f"to {month_label(end_period)}")
+                file_stem = f"frequency_{month_label(start_period)}_to_{month_label(end_period)}"
             
             if table is not None:
                 st.subheader(title)
-                st.pyplot(plot_histogram(table))
-                st.dataframe(
-                    table,
-                    use_container_width=True,
-                    column_config={
-                        "Freq": st.column_config.NumberColumn("Freq", width=60),
-                        "#Students": st.column_config.NumberColumn("#Students", width=80),
-                        "Cum 1->": st.column_config.NumberColumn("Cum 1->", width=70),
-                        "Cum ->End": st.column_config.NumberColumn("Cum ->End", width=80),
-                        "Details": st.column_config.TextColumn(
-                            "Details",
-                            width=350,
-                            help="Student details"
-                        )
-                    },
-                    hide_index=True
-                )
+                stats = table.attrs["stats"]
+                if stats["students"]:
+                    st.caption(" · ".join(
+                        [f"Students: {stats['students']}", f"Mean: {stats['mean']:.2f}"]
+                        + [f"P{p}: {stats[f'p{p}']:.1f}" for p in STAT_PERCENTILES]
+                    ))
+                with timer.stage("chart", rows=len(table)):
+                    if chart_backend == "Interactive":
+                        st.altair_chart(histogram_chart(table), use_container_width=True)
+                    else:
+                        st.image(render_histogram_png(table), use_container_width=True)
+                with timer.stage("st.dataframe", rows=len(table)):
+                    st.dataframe(
+                        table,
+                        use_container_width=True,
+                        column_config={
+                            "Freq": st.column_config.NumberColumn("Freq", width=60),
+                            "#Students": st.column_config.NumberColumn("#Students", width=80),
+                            "Cum 1->": st.column_config.NumberColumn("Cum 1->", width=70),
+                            "Cum ->End": st.column_config.NumberColumn("Cum ->End", width=80)
+                        },
+                        hide_index=True
+                    )
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    export_format = st.radio("Export format:", list(MIME_TYPES), horizontal=True)
+                with col2:
+                    st.download_button(
+                        "Download frequency table",
+                        data=table_download(table, export_format),
+                        file_name=f"{file_stem}.{export_format}",
+                        mime=MIME_TYPES[export_format],
+                        on_click="ignore"
+                    )
+                with col3:
+                    st.download_button(
+                        "Download student list",
+                        data=students_download(data, selection, exclusions, max_upper,
+                                               export_format),
+                        file_name=f"{file_stem}_students.{export_format}",
+                        mime=MIME_TYPES[export_format],
+                        on_click="ignore"
+                    )
+                
+                st.subheader("Students")
+                col1, col2 = st.columns(2)
+                with col1:
+                    bucket = st.selectbox("Frequency:", range(1, max_upper + 2),
+                                          format_func=lambda b: str(table["Freq"].iloc[b - 1]))
+                n_students = int(table["#Students"].iloc[bucket - 1])
+                n_pages = max((n_students + STUDENT_PAGE_SIZE - 1) // STUDENT_PAGE_SIZE, 1)
+                with col2:
+                    page = st.number_input("Page:", min_value=1, max_value=n_pages, value=1,
+                                           key=f"student-page-{bucket}-{n_pages}")
+                with timer.stage("student page", rows=n_students):
+                    students = count_bookings(data, exclusions=exclusions, **selection)
+                    page_rows, total = bucket_students(students, bucket, max_upper, page - 1)
+                    st.caption(f"Showing {min((page - 1) * STUDENT_PAGE_SIZE + 1, total)}"
+                               f"–{(page - 1) * STUDENT_PAGE_SIZE + len(page_rows)} of {total}")
+                    st.dataframe(page_rows, use_container_width=True, hide_index=True)
+            
+            with st.expander("Debug"):
+                st.write("Load", data.attrs.get("load_info", {}))
+                st.write("Memory", data.attrs.get("memory", {}))
+                st.write("Parse cache", get_parse_cache().stats())
+                st.write("Disk cache", get_disk_cache().stats())
+                if incremental:
+                    st.write("Dataset", get_dataset().stats())
+                st.write("Counts cache", get_counts_cache().stats())
+                st.write("Table cache", get_table_cache().stats())
+                st.write("Chart cache", get_chart_cache().stats())
+        
+        if show_perf:
+            with st.expander("Performance", expanded=True):
+                st.dataframe(timer.frame(), hide_index=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
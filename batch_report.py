@@ -0,0 +1,145 @@
+"""Generate booking frequency reports for many periods without the Streamlit UI.
+
+    python batch_report.py bookings.xlsx --out reports --range 2024-01:2024-06 --workers 4
+    python batch_report.py 2024-*.xlsx --all-sheets --out reports
+    python batch_report.py 2024-07.xlsx --dataset .frq_dataset --out reports
+    python batch_report.py bookings.parquet --students --format csv --out reports
+
+The workbooks are parsed once (in parallel when there are several), written
+to an Arrow IPC file and memory-mapped by every worker process, so the
+bookings are never pickled per task.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from bookings import (DEFAULT_EXCLUSIONS, LoadError, compile_exclusions, count_bookings,
+                      create_frequency_table, load_files, month_from_label, month_label)
+from charts import plot_histogram
+from dataset import BookingDataset
+from exports import STUDENT_HEADER, WRITERS, student_rows
+
+FORMATS = ["csv", "xlsx", "png"]
+RANGE_PATTERN = re.compile(r"(\d{4}-(?:0[1-9]|1[0-2])):(\d{4}-(?:0[1-9]|1[0-2]))")
+
+worker_state = {}
+
+def init_worker(arrow_path):
+    import pyarrow as pa
+
+    with pa.memory_map(arrow_path) as source:
+        worker_state["data"] = pa.ipc.open_file(source).read_all().to_pandas()
+
+def write_report(task):
+    name, selection, max_upper, exclusions, formats, out_dir, students = task
+    table = create_frequency_table(worker_state["data"], max_upper=max_upper,
+                                   exclusions=exclusions, **selection)
+    paths = []
+    if students:
+        counts = count_bookings(worker_state["data"], exclusions=exclusions, **selection)
+        for fmt in [fmt for fmt in formats if fmt in WRITERS]:
+            path = os.path.join(out_dir, f"frequency_{name}_students.{fmt}")
+            with open(path, "wb") as fh:
+                WRITERS[fmt](STUDENT_HEADER, student_rows(counts, max_upper), fh,
+                             sheet_title="Students")
+            paths.append(path)
+    for fmt in formats:
+        path = os.path.join(out_dir, f"frequency_{name}.{fmt}")
+        if fmt == "csv":
+            table.to_csv(path, index=False)
+        elif fmt == "xlsx":
+            table.to_excel(path, index=False)
+        else:
+            fig = plot_histogram(table)
+            fig.savefig(path, dpi=200, bbox_inches="tight")
+            fig.clear()
+        paths.append(path)
+    return name, paths
+
+def parse_range(window):
+    match = RANGE_PATTERN.fullmatch(window)
+    if match is None:
+        raise ValueError(f"invalid --range {window!r}, expected YYYY-MM:YYYY-MM")
+    start, end = match.groups()
+    if month_from_label(start) > month_from_label(end):
+        raise ValueError(f"invalid --range {window!r}, start is after end")
+    return start, end
+
+def build_tasks(months, ranges, exclusions, args):
+    selections = []
+    if not args.no_months:
+        selections += [(month_label(key), {"period": key}) for key in months]
+    for start, end in ranges:
+        selections.append((f"{start}_to_{end}", {
+            "start_period": month_from_label(start),
+            "end_period": month_from_label(end),
+        }))
+    return [(name, selection, args.max_upper, exclusions, args.format, args.out, args.students)
+            for name, selection in selections]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workbooks", nargs="+",
+                        help="booking exports (xlsx, csv, parquet or feather)")
+    parser.add_argument("--all-sheets", action="store_true",
+                        help="read every sheet instead of only the first")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--range", action="append", default=[], metavar="START:END",
+                        help="extra range report, e.g. 2024-01:2024-06 (repeatable)")
+    parser.add_argument("--no-months", action="store_true", help="skip the per-month reports")
+    parser.add_argument("--max-upper", type=int, default=15)
+    parser.add_argument("--exclude", action="append", metavar="PATTERN",
+                        help="class exclusion regex (repeatable, default: Self Practice)")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--students", action="store_true",
+                        help="also write the per-student list for each report (csv/xlsx)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--dataset", metavar="DIR",
+                        help="append the exports to this incremental dataset "
+                             "and report on all of it")
+    args = parser.parse_args()
+    try:
+        ranges = [parse_range(window) for window in args.range]
+    except ValueError as e:
+        parser.error(str(e))
+    exclusions = tuple(args.exclude) if args.exclude is not None else DEFAULT_EXCLUSIONS
+    try:
+        compile_exclusions(exclusions)
+    except re.error as e:
+        parser.error(f"invalid --exclude pattern: {e}")
+
+    try:
+        data = load_files(args.workbooks, sheet_name=None if args.all_sheets else 0,
+                          max_workers=args.workers, processes=True)
+    except LoadError as e:
+        sys.exit(str(e))
+    if args.dataset:
+        dataset = BookingDataset(args.dataset)
+        try:
+            summary = dataset.append(data)
+        except LoadError as e:
+            sys.exit(str(e))
+        print(f"{args.dataset}: added {summary['added']} bookings "
+              f"({summary['duplicates']} already stored)")
+        data = dataset.aggregates()
+    os.makedirs(args.out, exist_ok=True)
+    tasks = build_tasks(data.attrs["months"], ranges, exclusions, args)
+
+    import pyarrow as pa
+
+    with tempfile.TemporaryDirectory() as tmp:
+        arrow_path = os.path.join(tmp, "bookings.arrow")
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        with pa.OSFile(arrow_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        del table
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                                 initargs=(arrow_path,)) as pool:
+            for name, paths in pool.map(write_report, tasks):
+                print(f"{name}: {', '.join(paths)}")
+
+if __name__ == "__main__":
+    main()
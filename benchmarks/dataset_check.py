@@ -0,0 +1,70 @@
+"""Check that reports on the incremental dataset match reports on the raw bookings.
+
+Run from the repository root:
+
+    python benchmarks/dataset_check.py --rows 20000
+
+The synthetic export gets blank class names, undated rows and exact duplicate
+rows. It is appended in two overlapping uploads (older months first, then the
+full history again), and count_bookings on dataset.aggregates() is compared
+with count_bookings on the raw frame for every month, the full range and the
+all-time totals.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bookings import count_bookings, create_monthly_matrix, month_label, normalize_data
+from dataset import BookingDataset
+from synthetic import synthetic_bookings
+
+def sample_export(rows, seed):
+    raw = synthetic_bookings(rows, seed=seed)
+    raw.loc[::50, "Class_Name"] = None
+    raw.loc[7::500, "Start_Date_time"] = pd.NaT
+    duplicates = raw.sample(frac=0.01, random_state=seed)
+    return pd.concat([raw, duplicates], ignore_index=True)
+
+def same_counts(raw, aggregates, **selection):
+    expected = count_bookings(raw, **selection).sort_values("Id_Person", ignore_index=True)
+    actual = count_bookings(aggregates, **selection).sort_values("Id_Person", ignore_index=True)
+    return (np.array_equal(expected["Id_Person"], actual["Id_Person"])
+            and np.array_equal(expected["Bookings"], actual["Bookings"]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = normalize_data(sample_export(args.rows, args.seed))
+    months = raw.attrs["months"]
+    older = raw[raw["Month_Key"] < months[len(months) // 2]]
+    with tempfile.TemporaryDirectory() as directory:
+        dataset = BookingDataset(directory)
+        dataset.append(older)
+        summary = dataset.append(raw)
+        aggregates = dataset.aggregates()
+
+    print(f"{len(raw)} bookings, {summary['added']} added by the second upload, "
+          f"{summary['duplicates']} already stored")
+    failures = [month_label(month) for month in months
+                if not same_counts(raw, aggregates, period=month)]
+    if not same_counts(raw, aggregates, start_period=months[0], end_period=months[-1]):
+        failures.append("full range")
+    if not same_counts(raw, aggregates):
+        failures.append("all-time totals")
+    if not create_monthly_matrix(raw, 15).equals(create_monthly_matrix(aggregates, 15)):
+        failures.append("monthly matrix")
+    if failures:
+        sys.exit(f"dataset counts differ from the raw bookings for: {', '.join(failures)}")
+    print(f"counts match for {len(months)} months, the full range and the all-time totals")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare legacy Details strings with bucketing plus one drill-down page per bucket.
+
+Run from the repository root:
+
+    python benchmarks/details_benchmark.py --rows 200000 --students 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bookings import bucket_bookings, bucket_students, count_bookings, normalize_data
+from synthetic import synthetic_bookings
+
+def legacy_details(data, max_upper):
+    data_filtered = data[~data["Class_Name"].str.contains("Self Practice", case=False, na=False)]
+    booking_frequencies = data_filtered.groupby("Id_Person").size()
+    freqs = list(range(1, max_upper + 1)) + [f">{max_upper}"]
+
+    def get_student_details(freq):
+        if isinstance(freq, str):
+            mask = booking_frequencies > max_upper
+        else:
+            mask = booking_frequencies == freq
+        student_info = (data_filtered[data_filtered["Id_Person"].isin(booking_frequencies[mask].index)]
+                        .groupby("Id_Person")["FirstName"]
+                        .first())
+        return ", ".join(f"{person} : {name}" for person, name in student_info.items())
+
+    return [get_student_details(freq) for freq in freqs]
+
+def drill_down(data, max_upper):
+    students = count_bookings(data)
+    table = bucket_bookings(students, max_upper)
+    return table, [bucket_students(students, bucket, max_upper)[0]
+                   for bucket in range(1, max_upper + 2)]
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--max-upper", type=int, nargs="+", default=[5, 15, 50, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # No digest: count_bookings then rebuilds its counts on every call, like the legacy path.
+    data = normalize_data(synthetic_bookings(args.rows, args.students))
+
+    print(f"{'max_upper':>9} {'legacy s':>10} {'drill-down s':>14} {'speedup':>8}")
+    for max_upper in args.max_upper:
+        legacy = best_of(lambda: legacy_details(data, max_upper), args.repeat)
+        current = best_of(lambda: drill_down(data, max_upper), args.repeat)
+        print(f"{max_upper:>9} {legacy:>10.3f} {current:>14.3f} {legacy / current:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
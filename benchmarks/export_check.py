@@ -0,0 +1,72 @@
+"""Check that the app's download callables produce files Streamlit accepts and reads back.
+
+Run from the repository root:
+
+    python benchmarks/export_check.py --rows 20000
+
+Each callable is called twice, as two clicks on the same button would, and passed
+through Streamlit's own download conversion. The result is parsed with pandas and
+compared with the frequency table and count_bookings.
+"""
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bookings import DEFAULT_EXCLUSIONS, count_bookings, create_frequency_table, normalize_data
+from exports import MIME_TYPES, STUDENT_HEADER, students_download, table_download
+from synthetic import synthetic_bookings
+
+def read_export(content, fmt):
+    if fmt == "csv":
+        return pd.read_csv(io.BytesIO(content))
+    return pd.concat(pd.read_excel(io.BytesIO(content), sheet_name=None).values(),
+                     ignore_index=True)
+
+def main():
+    from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--max-upper", type=int, default=15)
+    args = parser.parse_args()
+
+    data = normalize_data(synthetic_bookings(args.rows))
+    months = data.attrs["months"]
+    selection = {"start_period": months[0], "end_period": months[-1]}
+    table = create_frequency_table(data, max_upper=args.max_upper, **selection)
+    students = count_bookings(data, **selection)
+
+    failures = []
+    for fmt in MIME_TYPES:
+        downloads = {
+            "table": table_download(table, fmt),
+            "students": students_download(data, selection, DEFAULT_EXCLUSIONS, args.max_upper,
+                                          fmt),
+        }
+        for name, download in downloads.items():
+            for click in (1, 2):
+                content, _ = convert_data_to_bytes_and_infer_mime(
+                    download(), unsupported_error=TypeError(f"{name} {fmt}: unsupported type"))
+                exported = read_export(content, fmt)
+                if name == "table":
+                    ok = (list(exported.columns) == list(table.columns)
+                          and np.array_equal(exported["#Students"], table["#Students"]))
+                else:
+                    ok = (list(exported.columns) == STUDENT_HEADER
+                          and np.array_equal(exported["Id_Person"], students["Id_Person"])
+                          and np.array_equal(exported["Bookings"], students["Bookings"]))
+                if not ok:
+                    failures.append(f"{name} {fmt} (click {click})")
+                print(f"{name:>8} {fmt:<4} click {click}: {len(content):>9,} bytes "
+                      f"{'ok' if ok else 'MISMATCH'}")
+    if failures:
+        sys.exit(f"exports differ from the report for: {', '.join(failures)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Render the histogram repeatedly and check that resident memory stays flat.
+
+Run from the repository root:
+
+    python benchmarks/figure_stress.py --renders 5000
+"""
+import argparse
+import gc
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bookings import frequency_stats
+from charts import plot_histogram
+from perf import rss_bytes
+
+def sample_table(rng, max_upper):
+    students = rng.integers(0, 200, max_upper + 1)
+    table = pd.DataFrame({
+        "Freq": list(range(1, max_upper + 1)) + [f">{max_upper}"],
+        "#Students": students,
+    })
+    table.attrs["stats"] = frequency_stats(range(1, max_upper + 2), students)
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    checkpoints = max(args.renders // 10, 1)
+    baseline = None
+    for i in range(args.warmup + args.renders):
+        fig = plot_histogram(sample_table(rng, int(rng.integers(5, 30))))
+        fig.savefig(io.BytesIO(), format="png")
+        fig.clear()
+        if i + 1 == args.warmup:
+            gc.collect()
+            baseline = rss_bytes()
+        elif i >= args.warmup and (i + 1 - args.warmup) % checkpoints == 0:
+            print(f"{i + 1 - args.warmup:>8} renders  rss {rss_bytes() / 2 ** 20:8.1f} MiB")
+
+    gc.collect()
+    growth = (rss_bytes() - baseline) / 2 ** 20
+    print(f"RSS growth after {args.renders} renders: {growth:.1f} MiB")
+    if growth > args.max_growth_mb:
+        sys.exit(f"memory grew by more than {args.max_growth_mb} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Measure app start-up import cost with ``python -X importtime``.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py --save import_baseline.json
+    python benchmarks/import_time.py --compare import_baseline.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+WATCHED = ["streamlit", "pandas", "numpy", "pyarrow", "matplotlib", "altair", "openpyxl", "python_calamine"]
+
+def measure(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules, children, direct = {}, [], []
+    for match in LINE.finditer(result.stderr):
+        _, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        modules[name] = int(cumulative_us)
+        if depth == 1:
+            children.append((name, int(cumulative_us)))
+        elif depth == 0:
+            if name == module:
+                direct = children
+            children = []
+    return modules, direct
+
+def summarize(module, repeat):
+    runs = [measure(module) for _ in range(repeat)]
+    modules, direct = min(runs, key=lambda run: run[0][module])
+    direct = sorted(direct, key=lambda item: item[1], reverse=True)
+    return {
+        "module": module,
+        "total_ms": modules[module] / 1000,
+        "modules_loaded": len(modules),
+        "heavy_loaded": [name for name in WATCHED if name in modules],
+        "top_imports_ms": {name: us / 1000 for name, us in direct[:10]},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="write the measurement to this JSON file")
+    parser.add_argument("--compare", help="fail if slower than this baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    summary = summarize(args.module, args.repeat)
+    print(f"import {summary['module']}: {summary['total_ms']:.1f} ms, "
+          f"{summary['modules_loaded']} modules")
+    print(f"heavy modules loaded: {', '.join(summary['heavy_loaded']) or 'none'}")
+    for name, ms in summary["top_imports_ms"].items():
+        print(f"  {name:<30} {ms:8.1f} ms")
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(summary, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        limit = baseline["total_ms"] * (1 + args.tolerance)
+        new_heavy = sorted(set(summary["heavy_loaded"]) - set(baseline["heavy_loaded"]))
+        print(f"baseline {baseline['total_ms']:.1f} ms, limit {limit:.1f} ms")
+        if new_heavy:
+            sys.exit(f"newly imported at start-up: {', '.join(new_heavy)}")
+        if summary["total_ms"] > limit:
+            sys.exit(f"import time regressed: {summary['total_ms']:.1f} ms > {limit:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Time each booking-report stage on synthetic data of increasing size.
+
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 10000000 --output bench.json
+    python benchmarks/run_benchmarks.py --rows 10000 100000 --compare bench.json
+
+Parsing is measured for every input format in --formats. Excel is only
+measured up to --xlsx-max-rows (a sheet holds at most 1,048,575 data rows,
+and writing large workbooks is slow).
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bookings
+import charts
+from synthetic import synthetic_bookings, write_export
+
+def clear_caches():
+    for getter in (bookings.get_counts_cache, bookings.get_table_cache, charts.get_chart_cache):
+        getter.cache_clear()
+
+def measure(func, repeat, trace_memory):
+    clear_caches()
+    func()
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    peak = None
+    if trace_memory:
+        clear_caches()
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return min(timings), peak
+
+def stages(rows, args, tmp_dir):
+    raw = synthetic_bookings(rows, months=args.months, seed=args.seed)
+    data = bookings.normalize_data(raw)
+    data.attrs["digest"] = f"benchmark-{rows}"
+    months = data.attrs["months"]
+    middle = months[len(months) // 2]
+
+    for fmt in args.formats:
+        if fmt == "xlsx" and rows > args.xlsx_max_rows:
+            continue
+        path = os.path.join(tmp_dir, f"bookings_{rows}.{fmt}")
+        write_export(raw, path)
+        with open(path, "rb") as fh:
+            content = fh.read()
+        yield f"parse_{fmt}", lambda content=content: bookings.parse_data(content)
+    yield "normalize", lambda: bookings.normalize_data(raw)
+    yield "booking_cube", lambda: bookings.BookingCube(data)
+    bookings.get_booking_cube(data)
+    yield "month_table", lambda: bookings.bucket_bookings(
+        bookings.count_bookings(data, period=middle), args.max_upper)
+    yield "range_table", lambda: bookings.bucket_bookings(
+        bookings.count_bookings(data, start_period=months[0], end_period=months[-1]), args.max_upper)
+    yield "monthly_matrix", lambda: bookings.create_monthly_matrix(data, args.max_upper)
+    table = bookings.create_frequency_table(data, start_period=months[0], end_period=months[-1],
+                                            max_upper=args.max_upper)
+    yield "histogram_png", lambda: charts.render_histogram_png(table)
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            for stage, func in stages(rows, args, tmp_dir):
+                seconds, peak = measure(func, args.repeat, not args.no_memory)
+                result = {
+                    "rows": rows,
+                    "stage": stage,
+                    "seconds": round(seconds, 6),
+                    "rows_per_second": round(rows / seconds) if seconds else None,
+                    "peak_bytes": peak,
+                }
+                results.append(result)
+                peak_text = f"{peak / 2 ** 20:10.1f} MiB" if peak is not None else ""
+                print(f"{rows:>10} {stage:<16} {seconds:10.4f} s "
+                      f"{result['rows_per_second'] or 0:>14,} rows/s {peak_text}", flush=True)
+    return results
+
+def compare(results, baseline_path):
+    with open(baseline_path) as fh:
+        baseline = {(r["rows"], r["stage"]): r for r in json.load(fh)["results"]}
+    print(f"\n{'rows':>10} {'stage':<16} {'baseline s':>11} {'now s':>10} {'ratio':>7}")
+    for result in results:
+        old = baseline.get((result["rows"], result["stage"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("nan")
+        print(f"{result['rows']:>10} {result['stage']:<16} {old['seconds']:>11.4f} "
+              f"{result['seconds']:>10.4f} {ratio:>6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--max-upper", type=int, default=15)
+    parser.add_argument("--formats", nargs="+", choices=bookings.INPUT_FORMATS,
+                        default=bookings.INPUT_FORMATS, help="input formats to parse")
+    parser.add_argument("--xlsx-max-rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="print ratios against an earlier JSON result")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "excel_engines": bookings.excel_engines(),
+                "args": vars(args),
+                "results": results,
+            }, fh, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Deterministic synthetic booking exports for benchmarks.
+
+    python benchmarks/synthetic.py --rows 100000 --students 5000 bookings.xlsx
+    python benchmarks/synthetic.py --rows 10000000 bookings.parquet
+
+The output format follows the file extension (xlsx, csv, parquet or feather).
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+EXCEL_MAX_ROWS = 1_048_575
+DEFAULT_CLASS_MIX = {"Yoga": 0.4, "Pilates": 0.3, "Spin": 0.2, "Barre": 0.1}
+
+def synthetic_bookings(rows, students=None, months=24, class_mix=None,
+                       self_practice_share=0.1, start="2023-01-01", seed=0):
+    rng = np.random.default_rng(seed)
+    students = students or max(rows // 20, 1)
+    class_mix = class_mix or DEFAULT_CLASS_MIX
+
+    ids = rng.zipf(1.3, rows) % students + 1
+    names = np.array([f"Student{i}" for i in range(students + 1)])
+    classes = list(class_mix) + ["Self Practice"]
+    weights = np.array(list(class_mix.values()), dtype=float)
+    weights = np.append(weights / weights.sum() * (1 - self_practice_share), self_practice_share)
+    start = pd.Timestamp(start)
+    span = ((start + pd.DateOffset(months=months)) - start).total_seconds()
+
+    return pd.DataFrame({
+        "Start_Date_time": start + pd.to_timedelta(rng.uniform(0, span, rows), unit="s").floor("min"),
+        "Class_Name": pd.Categorical.from_codes(rng.choice(len(classes), rows, p=weights),
+                                                classes).astype(str),
+        "Id_Person": ids,
+        "FirstName": names[ids],
+    })
+
+def write_workbook(data, path):
+    if len(data) > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(data)} rows exceed the Excel sheet limit of {EXCEL_MAX_ROWS}")
+    data.to_excel(path, index=False)
+
+def write_export(data, path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xlsx":
+        write_workbook(data, path)
+    elif extension == ".csv":
+        data.to_csv(path, index=False)
+    elif extension == ".parquet":
+        data.to_parquet(path, index=False)
+    elif extension == ".feather":
+        data.to_feather(path)
+    else:
+        raise ValueError(f"unsupported export format: {extension}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--students", type=int)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--self-practice-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = synthetic_bookings(args.rows, args.students, args.months,
+                              self_practice_share=args.self_practice_share, seed=args.seed)
+    write_export(data, args.path)
+
+if __name__ == "__main__":
+    main()
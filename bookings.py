@@ -0,0 +1,695 @@
+"""Loading, filtering and frequency statistics for booking exports.
+
+This module has no Streamlit dependency so the app, the batch CLI and the
+benchmarks share one engine. Errors are raised as LoadError.
+"""
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from perf import StageTimer
+
+REQUIRED_COLUMNS = ["Start_Date_time", "Class_Name", "Id_Person", "FirstName"]
+EXCEL_ENGINES = [("calamine", "python_calamine"), ("openpyxl", "openpyxl")]
+INPUT_FORMATS = ["xlsx", "csv", "parquet", "feather"]
+FORMAT_MAGIC = [(b"PK\x03\x04", "xlsx"), (b"PAR1", "parquet"), (b"ARROW1", "feather"),
+                (b"FEA1", "feather")]
+DEFAULT_EXCLUSIONS = ("Self Practice",)
+CACHE_VERSION = 5
+CATEGORY_MAX_RATIO = 0.5
+STAT_PERCENTILES = (25, 50, 75, 90)
+STUDENT_PAGE_SIZE = 100
+PARSE_CACHE_MAX_ENTRIES = 8
+PARSE_CACHE_MAX_BYTES = 1024 ** 3
+CUBE_CACHE_MAX_ENTRIES = 8
+COUNTS_CACHE_MAX_ENTRIES = 64
+COUNTS_CACHE_MAX_BYTES = 512 * 1024 ** 2
+TABLE_CACHE_MAX_ENTRIES = 256
+TABLE_CACHE_MAX_BYTES = 256 * 1024 ** 2
+DISK_CACHE_DIR = os.environ.get("FRQ_CACHE_DIR", ".frq_cache")
+DISK_CACHE_MAX_BYTES = int(os.environ.get("FRQ_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+LOAD_MAX_WORKERS = int(os.environ.get("FRQ_LOAD_WORKERS", min(4, os.cpu_count() or 1)))
+
+logger = logging.getLogger("frq.cache")
+
+class LoadError(ValueError):
+    pass
+
+class LRUCache:
+    def __init__(self, max_entries, max_bytes=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+class DiskCache:
+    # One Arrow file plus a small JSON sidecar per entry and no shared manifest, so several
+    # app processes can share the directory. Recency is the Arrow file's mtime. Failures
+    # are logged and treated as misses: the cache must never fail a load.
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write_atomic(self, name, mode, write):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode) as fh:
+                write(fh)
+            os.replace(tmp, self._path(name))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                files = [(entry.name[:-len(".arrow")], entry.stat())
+                         for entry in entries if entry.name.endswith(".arrow")]
+        except OSError:
+            return []
+        return sorted(((key, stat.st_mtime, stat.st_size) for key, stat in files),
+                      key=lambda entry: entry[1])
+
+    def get(self, key):
+        import pyarrow as pa
+
+        path = self._path(f"{key}.arrow")
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        try:
+            with pa.memory_map(path) as source:
+                data = pa.ipc.open_file(source).read_all().to_pandas()
+            with open(self._path(f"{key}.json")) as fh:
+                load_info = json.load(fh).get("load_info", {})
+            os.utime(path)
+        except (OSError, ValueError, pa.ArrowException) as e:
+            logger.warning("disk cache read failed for %s: %s", key, e)
+            self.errors += 1
+            self.misses += 1
+            return None
+        data.attrs["load_info"] = dict(load_info, source="disk")
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        import pyarrow as pa
+
+        def write_table(sink):
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        try:
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_atomic(f"{key}.json", "w", lambda fh: json.dump({
+                "rows": table.num_rows,
+                "load_info": data.attrs.get("load_info", {}),
+            }, fh))
+            self._write_atomic(f"{key}.arrow", "wb", write_table)
+            self._evict(keep=key)
+        except (OSError, ValueError, pa.ArrowException) as e:
+            logger.warning("disk cache write failed for %s: %s", key, e)
+            self.errors += 1
+
+    def _evict(self, keep):
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for name in (f"{key}.arrow", f"{key}.json"):
+                with contextlib.suppress(OSError):
+                    os.remove(self._path(name))
+            total -= size
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+def compile_exclusions(patterns: Iterable[str]) -> re.Pattern | None:
+    patterns = [pattern.strip() for pattern in patterns if pattern.strip()]
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+def exclusion_mask(class_names: pd.Series, patterns: Iterable[str]) -> np.ndarray:
+    regex = compile_exclusions(patterns)
+    if regex is None:
+        return np.zeros(len(class_names), dtype=bool)
+    class_names = class_names.astype("category")
+    excluded = np.array([regex.search(str(name)) is not None
+                         for name in class_names.cat.categories] + [False])
+    return excluded[class_names.cat.codes.to_numpy()]
+
+class BookingCube:
+    def __init__(self, data: pd.DataFrame, exclusions: Iterable[str] = DEFAULT_EXCLUSIONS):
+        included = data[~exclusion_mask(data["Class_Name"], exclusions)]
+        codes, self.persons = pd.factorize(included["Id_Person"], sort=True)
+        known = codes >= 0
+        self.names = (included["FirstName"][known].groupby(codes[known]).first()
+                      .reindex(range(len(self.persons))).to_numpy())
+        # Pre-aggregated rows (see dataset.py) carry their booking count in "Bookings".
+        weights = included["Bookings"].to_numpy() if "Bookings" in included else None
+        self.totals = np.bincount(codes[known], weights=None if weights is None else weights[known],
+                                  minlength=len(self.persons)).astype(np.int64)
+
+        months = included["Month_Key"].to_numpy()
+        dated = known & (months >= 0)
+        self.first_month = int(months[dated].min()) if dated.any() else 0
+        self.n_months = int(months[dated].max()) - self.first_month + 1 if dated.any() else 0
+        # Sparse person x month counts: one entry per (person, month) with bookings, sorted
+        # by person * n_months + month, and a running total over the entries. A person's
+        # count for a month range is the difference of two binary searches into it.
+        keys = codes[dated].astype(np.int64) * self.n_months + (months[dated] - self.first_month)
+        self.keys, entry = np.unique(keys, return_inverse=True)
+        self.counts = np.bincount(entry, weights=None if weights is None else weights[dated],
+                                  minlength=len(self.keys)).astype(np.int32)
+        self.running = np.zeros(len(self.keys) + 1, dtype=np.int64)
+        np.cumsum(self.counts, out=self.running[1:])
+
+    def person_counts(self, start_month: int | None = None,
+                      end_month: int | None = None) -> np.ndarray:
+        if start_month is None or end_month is None:
+            return self.totals
+        lo = max(start_month - self.first_month, 0)
+        hi = min(end_month - self.first_month, self.n_months - 1)
+        if hi < lo:
+            return np.zeros(len(self.persons), dtype=np.int32)
+        rows = np.arange(len(self.persons), dtype=np.int64) * self.n_months
+        end = np.searchsorted(self.keys, rows + hi, side="right")
+        start = np.searchsorted(self.keys, rows + lo, side="left")
+        return (self.running[end] - self.running[start]).astype(np.int32)
+
+    def monthly_counts(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.keys % max(self.n_months, 1), self.counts
+
+    def nbytes(self) -> int:
+        return (self.keys.nbytes + self.counts.nbytes + self.running.nbytes
+                + self.totals.nbytes + self.names.nbytes)
+
+@functools.cache
+def get_cube_cache():
+    return LRUCache(CUBE_CACHE_MAX_ENTRIES, sizeof=lambda cube: cube.nbytes())
+
+def get_booking_cube(data: pd.DataFrame,
+                     exclusions: Iterable[str] = DEFAULT_EXCLUSIONS) -> BookingCube:
+    if data.attrs.get("digest") is None:
+        return BookingCube(data, exclusions)
+    key = (data.attrs["digest"], tuple(exclusions))
+    cache = get_cube_cache()
+    cube = cache.get(key)
+    if cube is None:
+        cube = BookingCube(data, exclusions)
+        cache.put(key, cube)
+    return cube
+
+@functools.cache
+def get_disk_cache():
+    return DiskCache(DISK_CACHE_DIR, DISK_CACHE_MAX_BYTES)
+
+@functools.cache
+def get_parse_cache():
+    return LRUCache(
+        PARSE_CACHE_MAX_ENTRIES,
+        max_bytes=PARSE_CACHE_MAX_BYTES,
+        sizeof=lambda data: int(data.memory_usage(deep=True).sum()),
+    )
+
+def read_bytes(file) -> bytes:
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    with open(file, "rb") as fh:
+        return fh.read()
+
+def content_digest(content: bytes, **options) -> str:
+    digest = hashlib.sha256(content)
+    digest.update(repr(sorted(options.items())).encode())
+    return digest.hexdigest()
+
+def month_key(dates: pd.Series) -> pd.Series:
+    keys = (dates.dt.year - 1970) * 12 + dates.dt.month - 1
+    return keys.fillna(-1).astype("int16")
+
+def month_label(key: int) -> str:
+    year, month = divmod(int(key), 12)
+    return f"{1970 + year:04d}-{month + 1:02d}"
+
+def month_from_label(label: str) -> int:
+    year, month = label.split("-")
+    return (int(year) - 1970) * 12 + int(month) - 1
+
+def compact_strings(values: pd.Series) -> pd.Series:
+    values = values.astype("string")
+    if values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+        return values.astype("category")
+    return values
+
+def normalize_data(data: pd.DataFrame) -> pd.DataFrame:
+    memory_before = int(data.memory_usage(deep=True).sum())
+    data = data[REQUIRED_COLUMNS].copy()
+    data["Start_Date_time"] = pd.to_datetime(data["Start_Date_time"], errors="coerce")
+    try:
+        data["Id_Person"] = pd.to_numeric(data["Id_Person"], downcast="integer")
+    except (ValueError, TypeError):
+        data["Id_Person"] = compact_strings(data["Id_Person"])
+    data["Class_Name"] = data["Class_Name"].astype("string").astype("category")
+    data["FirstName"] = compact_strings(data["FirstName"])
+    data["Month_Key"] = month_key(data["Start_Date_time"])
+    data.attrs["months"] = sorted(int(key) for key in data["Month_Key"].unique() if key >= 0)
+    data.attrs["memory"] = {
+        "before_bytes": memory_before,
+        "after_bytes": int(data.memory_usage(deep=True).sum()),
+    }
+    return data
+
+def excel_engines() -> list[str]:
+    return [engine for engine, module in EXCEL_ENGINES if importlib.util.find_spec(module)]
+
+def read_excel(content: bytes, sheet_name: int | str = 0,
+               engine: str | None = None) -> pd.DataFrame:
+    engines = [engine] if engine else excel_engines()
+    for candidate in engines:
+        start = time.perf_counter()
+        try:
+            data = pd.read_excel(
+                io.BytesIO(content),
+                sheet_name=sheet_name,
+                engine=candidate,
+                usecols=lambda column: column in REQUIRED_COLUMNS,
+            )
+        except ImportError:
+            continue
+        data.attrs["load_info"] = {
+            "source": "parse",
+            "engine": candidate,
+            "parse_seconds": round(time.perf_counter() - start, 3),
+        }
+        return data
+    raise ImportError(f"No Excel reader engine available (tried: {', '.join(engines)})")
+
+def sheet_names(content: bytes) -> list[str]:
+    for engine in excel_engines():
+        try:
+            with pd.ExcelFile(io.BytesIO(content), engine=engine) as workbook:
+                return [str(name) for name in workbook.sheet_names]
+        except ImportError:
+            continue
+    raise ImportError("No Excel reader engine available")
+
+def csv_engine() -> str:
+    return "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+def read_csv(content: bytes) -> pd.DataFrame:
+    engine = csv_engine()
+    header = pd.read_csv(io.BytesIO(content), nrows=0).columns
+    data = pd.read_csv(io.BytesIO(content), engine=engine,
+                       usecols=[column for column in REQUIRED_COLUMNS if column in header])
+    data.attrs["load_info"] = {"source": "parse", "engine": engine}
+    return data
+
+def read_columnar(content: bytes, fmt: str) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = pa.BufferReader(content)
+    if fmt == "parquet":
+        reader = pq.ParquetFile(source)
+        columns = [column for column in REQUIRED_COLUMNS if column in reader.schema_arrow.names]
+        data = reader.read(columns=columns).to_pandas()
+    else:
+        reader = pa.ipc.open_file(source)
+        columns = [column for column in REQUIRED_COLUMNS if column in reader.schema.names]
+        data = reader.read_all().select(columns).to_pandas()
+    data.attrs["load_info"] = {"source": "parse", "engine": "pyarrow"}
+    return data
+
+def detect_format(content: bytes, name: str = "") -> str:
+    for magic, fmt in FORMAT_MAGIC:
+        if content.startswith(magic):
+            return fmt
+    extension = os.path.splitext(name)[1].lower().lstrip(".")
+    if extension in INPUT_FORMATS and extension != "csv":
+        raise LoadError(f"{name}: not a valid {extension} file")
+    return "csv"
+
+def read_source(content: bytes, fmt: str, sheet_name: int | str = 0) -> pd.DataFrame:
+    if fmt == "xlsx":
+        return read_excel(content, sheet_name=sheet_name)
+    if fmt == "csv":
+        return read_csv(content)
+    return read_columnar(content, fmt)
+
+def part_label(name: str, sheet_name: int | str) -> str:
+    return name if sheet_name == 0 else f"{name} [{sheet_name}]"
+
+def part_sheets(content: bytes, fmt: str, sheet_name: int | str | None) -> list[int | str]:
+    if fmt != "xlsx":
+        return [0]
+    return sheet_names(content) if sheet_name is None else [sheet_name]
+
+def has_rows(data: pd.DataFrame, content: bytes, fmt: str, sheet_name: int | str) -> bool:
+    if len(data) or fmt != "xlsx":
+        return len(data) > 0
+    # Column pruning also drops the rows of a sheet without any required column.
+    probe = pd.read_excel(io.BytesIO(content), sheet_name=sheet_name, nrows=1,
+                          engine=data.attrs["load_info"]["engine"])
+    return len(probe) > 0
+
+def parse_part(name: str, content: bytes, sheet_name: int | str = 0,
+               fmt: str = "xlsx") -> pd.DataFrame:
+    start = time.perf_counter()
+    data = read_source(content, fmt, sheet_name=sheet_name)
+    label = part_label(name, sheet_name)
+    info = {"file": name, "sheet": sheet_name, "format": fmt,
+            "engine": data.attrs["load_info"]["engine"]}
+    # Blank sheets and sheets without any booking column (notes, lookups) are skipped;
+    # a sheet with only some of the columns is a broken export and still fails.
+    skipped = None
+    if not any(column in data.columns for column in REQUIRED_COLUMNS):
+        skipped = "no booking columns" if has_rows(data, content, fmt, sheet_name) else "no rows"
+    elif not len(data):
+        skipped = "no rows"
+    if skipped:
+        data.attrs["load_info"] = dict(info, rows=0, skipped=skipped,
+                                       parse_seconds=round(time.perf_counter() - start, 3))
+        return data
+    for column in REQUIRED_COLUMNS:
+        if column not in data.columns:
+            raise LoadError(f"{label}: required column '{column}' not found")
+    data["Start_Date_time"] = pd.to_datetime(data["Start_Date_time"], errors="coerce")
+    if data["Start_Date_time"].isna().all():
+        raise LoadError(f"{label}: could not parse any dates in 'Start_Date_time'")
+    data.attrs["load_info"] = dict(info, rows=len(data),
+                                   parse_seconds=round(time.perf_counter() - start, 3))
+    return data
+
+def parse_pool(workers: int, processes: bool):
+    # Threads by default: the app runs inside a multi-threaded server, which must not be
+    # forked, and threads avoid pickling every upload. The batch CLI opts into spawned
+    # processes.
+    if processes:
+        return ProcessPoolExecutor(max_workers=workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=workers)
+
+def parse_parts(sources: list[tuple[str, bytes]], sheet_name: int | str | None = 0,
+                timer: StageTimer | None = None, max_workers: int | None = None,
+                processes: bool = False) -> pd.DataFrame:
+    timer = timer or StageTimer(enabled=False)
+    tasks = []
+    for name, content in sources:
+        fmt = detect_format(content, name)
+        tasks += [(name, content, sheet, fmt) for sheet in part_sheets(content, fmt, sheet_name)]
+    if not tasks:
+        raise LoadError("No sheets to load")
+    workers = min(max_workers or LOAD_MAX_WORKERS, len(tasks))
+    start = time.perf_counter()
+    with timer.stage("parse") as record:
+        if workers > 1:
+            with parse_pool(workers, processes) as pool:
+                parts = list(pool.map(parse_part, *zip(*tasks)))
+        else:
+            parts = [parse_part(*task) for task in tasks]
+        record["rows"] = sum(len(part) for part in parts)
+    part_info = [part.attrs["load_info"] for part in parts]
+    for info in part_info:
+        timer.add(f"  {part_label(info['file'], info['sheet'])}", info["parse_seconds"],
+                  rows=info["rows"])
+    parts = [part for part in parts if "skipped" not in part.attrs["load_info"]]
+    if not parts:
+        reasons = "; ".join(f"{part_label(info['file'], info['sheet'])}: {info['skipped']}"
+                            for info in part_info)
+        raise LoadError(f"No bookings found ({reasons}). "
+                        f"Required columns: {', '.join(REQUIRED_COLUMNS)}")
+    with timer.stage("date conversion + dtypes", rows=record["rows"]):
+        data = normalize_data(pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0])
+    if data["Start_Date_time"].isna().all():
+        raise LoadError("Could not parse any dates in 'Start_Date_time'")
+    data.attrs["load_info"] = {
+        "source": "parse",
+        "format": part_info[0]["format"],
+        "engine": part_info[0]["engine"],
+        "parse_seconds": round(time.perf_counter() - start, 3),
+        "workers": workers,
+        "pool": ("processes" if processes else "threads") if workers > 1 else None,
+        "parts": part_info,
+    }
+    return data
+
+def parse_data(content: bytes, sheet_name: int | str | None = 0,
+               timer: StageTimer | None = None, name: str = "upload") -> pd.DataFrame:
+    return parse_parts([(name, content)], sheet_name=sheet_name, timer=timer)
+
+def source_name(file) -> str:
+    return os.path.basename(getattr(file, "name", None) or str(file))
+
+def load_files(files, sheet_name: int | str | None = 0, timer: StageTimer | None = None,
+               max_workers: int | None = None, processes: bool = False) -> pd.DataFrame:
+    try:
+        sources = [(source_name(file), read_bytes(file)) for file in files]
+        if not sources:
+            raise LoadError("No files selected")
+        key = content_digest(
+            b"".join(hashlib.sha256(content).digest() for _, content in sources),
+            sheet_name=sheet_name, version=CACHE_VERSION,
+        )
+        cache = get_parse_cache()
+        data = cache.get(key)
+        if data is None:
+            disk_cache = get_disk_cache()
+            data = disk_cache.get(key)
+            if data is None:
+                data = parse_parts(sources, sheet_name=sheet_name, timer=timer,
+                                   max_workers=max_workers, processes=processes)
+                disk_cache.put(key, data)
+            data.attrs["digest"] = key
+            cache.put(key, data)
+        return data
+    except LoadError:
+        raise
+    except Exception as e:
+        raise LoadError(f"Error loading file: {e}") from e
+
+def load_data(file, sheet_name: int | str | None = 0,
+              timer: StageTimer | None = None) -> pd.DataFrame:
+    return load_files([file], sheet_name=sheet_name, timer=timer)
+
+def histogram_quantile(values: np.ndarray, weights: np.ndarray, q: float) -> float:
+    cumulative = np.cumsum(weights)
+    position = q * (cumulative[-1] - 1)
+    lower = values[np.searchsorted(cumulative, np.floor(position), side="right")]
+    upper = values[np.searchsorted(cumulative, np.ceil(position), side="right")]
+    return float(lower + (upper - lower) * (position - np.floor(position)))
+
+def frequency_stats(values, weights, percentiles: Iterable[int] = STAT_PERCENTILES) -> dict:
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights)
+    total = int(weights.sum())
+    if total == 0:
+        return {"students": 0}
+    stats = {"students": total, "mean": float((values * weights).sum() / total)}
+    for percentile in percentiles:
+        stats[f"p{percentile}"] = histogram_quantile(values, weights, percentile / 100)
+    stats["median"] = histogram_quantile(values, weights, 0.5)
+    return stats
+
+def selection_key(period: int | None = None, start_period: int | None = None,
+                  end_period: int | None = None) -> tuple:
+    if period is not None:
+        return ("period", int(period))
+    if start_period is not None and end_period is not None:
+        return ("range", int(start_period), int(end_period))
+    return ("all",)
+
+@functools.cache
+def get_counts_cache():
+    return LRUCache(COUNTS_CACHE_MAX_ENTRIES, max_bytes=COUNTS_CACHE_MAX_BYTES,
+                    sizeof=lambda students: int(students.memory_usage(deep=True).sum()))
+
+def count_bookings(data: pd.DataFrame, period: int | None = None, start_period: int | None = None,
+                   end_period: int | None = None,
+                   exclusions: Iterable[str] = DEFAULT_EXCLUSIONS) -> pd.DataFrame:
+    key = None
+    if data.attrs.get("digest") is not None:
+        key = (data.attrs["digest"], selection_key(period, start_period, end_period),
+               tuple(exclusions))
+        students = get_counts_cache().get(key)
+        if students is not None:
+            return students
+    
+    cube = get_booking_cube(data, exclusions)
+    if period is not None:
+        counts = cube.person_counts(period, period)
+    else:
+        counts = cube.person_counts(start_period, end_period)
+    active = np.flatnonzero(counts)
+    order = active[np.argsort(counts[active], kind="stable")]
+    students = pd.DataFrame({
+        "Id_Person": cube.persons[order],
+        "FirstName": cube.names[order],
+        "Bookings": counts[order],
+    })
+    exact = np.bincount(counts[active])
+    students.attrs["stats"] = frequency_stats(np.arange(len(exact)), exact)
+    
+    if key is not None:
+        get_counts_cache().put(key, students)
+    return students
+
+def frequency_labels(max_upper: int) -> list:
+    return list(range(1, max_upper + 1)) + [f">{max_upper}"]
+
+def bucket_sizes(bookings: np.ndarray, max_upper: int, groups: np.ndarray | None = None,
+                 n_groups: int = 1) -> np.ndarray:
+    buckets = np.minimum(bookings, max_upper + 1)
+    if groups is None:
+        return np.bincount(buckets, minlength=max_upper + 2)[1:]
+    offsets = groups * (max_upper + 2) + buckets
+    return np.bincount(offsets, minlength=(max_upper + 2) * n_groups).reshape(
+        n_groups, max_upper + 2)[:, 1:]
+
+def bucket_bookings(students: pd.DataFrame, max_upper: int) -> pd.DataFrame:
+    bookings = students["Bookings"].to_numpy()
+    
+    table = pd.DataFrame({
+        "Freq": frequency_labels(max_upper),
+        "#Students": bucket_sizes(bookings, max_upper)
+    })
+    
+    table["#Students"] = table["#Students"].astype(int)
+    table["Cum 1->"] = table["#Students"].cumsum()
+    table["Cum ->End"] = table["#Students"].sum() - table["Cum 1->"] + table["#Students"]
+    table.index = range(len(table))
+    table.attrs["stats"] = students.attrs["stats"]
+    return table
+
+def bucket_students(students: pd.DataFrame, bucket: int, max_upper: int, page: int = 0,
+                    page_size: int = STUDENT_PAGE_SIZE) -> tuple[pd.DataFrame, int]:
+    bookings = students["Bookings"].to_numpy()
+    if bucket > max_upper:
+        start = int(np.searchsorted(bookings, max_upper, side="right"))
+        end = len(bookings)
+    else:
+        start = int(np.searchsorted(bookings, bucket, side="left"))
+        end = int(np.searchsorted(bookings, bucket, side="right"))
+    first = min(start + page * page_size, end)
+    rows = students.iloc[first:min(first + page_size, end)]
+    return rows[["Id_Person", "FirstName", "Bookings"]], end - start
+
+@functools.cache
+def get_table_cache():
+    return LRUCache(TABLE_CACHE_MAX_ENTRIES, max_bytes=TABLE_CACHE_MAX_BYTES,
+                    sizeof=lambda table: int(table.memory_usage(deep=True).sum()))
+
+def create_frequency_table(data: pd.DataFrame, period: int | None = None,
+                           start_period: int | None = None, end_period: int | None = None,
+                           max_upper: int = 10,
+                           exclusions: Iterable[str] = DEFAULT_EXCLUSIONS) -> pd.DataFrame:
+    if data.attrs.get("digest") is None:
+        return bucket_bookings(count_bookings(data, period, start_period, end_period, exclusions),
+                               max_upper)
+    key = (data.attrs["digest"], selection_key(period, start_period, end_period),
+           tuple(exclusions), int(max_upper))
+    cache = get_table_cache()
+    table = cache.get(key)
+    if table is None:
+        table = bucket_bookings(count_bookings(data, period, start_period, end_period, exclusions),
+                                max_upper)
+        cache.put(key, table)
+    return table
+
+def create_monthly_matrix(data: pd.DataFrame, max_upper: int = 10,
+                          exclusions: Iterable[str] = DEFAULT_EXCLUSIONS) -> pd.DataFrame:
+    key = None
+    if data.attrs.get("digest") is not None:
+        key = (data.attrs["digest"], ("all-months",), tuple(exclusions), int(max_upper))
+        matrix = get_table_cache().get(key)
+        if matrix is not None:
+            return matrix
+    
+    cube = get_booking_cube(data, exclusions)
+    months, counts = cube.monthly_counts()
+    matrix = pd.DataFrame(
+        bucket_sizes(counts, max_upper, groups=months, n_groups=cube.n_months),
+        index=[month_label(cube.first_month + i) for i in range(cube.n_months)],
+        columns=[str(freq) for freq in frequency_labels(max_upper)],
+    )
+    matrix.index.name = "Period"
+    
+    if key is not None:
+        get_table_cache().put(key, matrix)
+    return matrix
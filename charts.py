@@ -0,0 +1,144 @@
+"""Histogram and heatmap rendering for frequency tables (matplotlib and Altair)."""
+from __future__ import annotations
+
+import functools
+import io
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from bookings import LRUCache, content_digest, frequency_stats
+
+if TYPE_CHECKING:
+    import altair as alt
+    from matplotlib.figure import Figure
+
+CHART_CACHE_MAX_ENTRIES = 64
+CHART_DPI = 200
+
+def plot_histogram(table: pd.DataFrame) -> Figure:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    fig.subplots_adjust(left=0.15)
+    
+    bars = ax.bar(table["Freq"].astype(str), table["#Students"], color='skyblue', edgecolor='black', width=0.7)
+
+    stats = table.attrs.get("stats") or frequency_stats(range(1, len(table) + 1), table["#Students"])
+    if stats["students"]:
+        mean_val, median_val = stats["mean"], stats["median"]
+        last_bar = len(table) - 1
+        ax.axvline(min(mean_val - 1, last_bar), color='red', linestyle='--', linewidth=1,
+                   label=f'Mean: {mean_val:.2f}')
+        ax.axvline(min(median_val - 1, last_bar), color='green', linestyle='--', linewidth=1,
+                   label=f'Median: {median_val:.2f}')
+
+    for bar, count in zip(bars, table["#Students"]):
+        if count > 0:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2, height + 0.5, 
+                   str(count), ha='center', fontsize=8)
+
+    ax.set_xlabel("Frequency of Bookings", fontsize=9)
+    ax.set_ylabel("Number of Students", fontsize=9)
+    ax.set_xticks(range(len(table)))
+    ax.set_xticklabels(table["Freq"].astype(str), fontsize=8, rotation=45)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    ax.legend(fontsize=8, loc='upper right')
+    fig.tight_layout()
+    
+    return fig
+
+def histogram_chart(table: pd.DataFrame) -> alt.LayerChart:
+    import altair as alt
+
+    n_buckets = len(table)
+    stats = table.attrs.get("stats") or frequency_stats(range(1, n_buckets + 1), table["#Students"])
+    bars = pd.DataFrame({"Bucket": range(1, n_buckets + 1), "Students": table["#Students"].to_numpy()})
+    x_axis = alt.Axis(
+        values=list(range(1, n_buckets + 1)),
+        labelExpr=f"datum.value == {n_buckets} ? '{table['Freq'].iloc[-1]}' : datum.value",
+        labelAngle=-45,
+        title="Frequency of Bookings",
+    )
+    x_scale = alt.Scale(domain=[0.5, n_buckets + 0.5], nice=False)
+    base = alt.Chart(bars).transform_calculate(left="datum.Bucket - 0.35", right="datum.Bucket + 0.35")
+    chart = (
+        base.mark_bar(color="skyblue", stroke="black").encode(
+            x=alt.X("left:Q", scale=x_scale, axis=x_axis),
+            x2="right:Q",
+            y=alt.Y("Students:Q", title="Number of Students"),
+            y2=alt.datum(0),
+            tooltip=["Bucket:Q", "Students:Q"],
+        )
+        + base.transform_filter("datum.Students > 0").mark_text(dy=-6, fontSize=10).encode(
+            x=alt.X("Bucket:Q", scale=x_scale), y="Students:Q", text="Students:Q"
+        )
+    )
+    if stats["students"]:
+        rules = pd.DataFrame({
+            "Statistic": [f"Mean: {stats['mean']:.2f}", f"Median: {stats['median']:.2f}"],
+            "Value": [min(stats["mean"], n_buckets), min(stats["median"], n_buckets)],
+        })
+        chart += alt.Chart(rules).mark_rule(strokeDash=[4, 4]).encode(
+            x=alt.X("Value:Q", scale=x_scale),
+            color=alt.Color("Statistic:N", scale=alt.Scale(range=["red", "green"]),
+                            legend=alt.Legend(title=None, orient="top-right")),
+        )
+    return chart
+
+def plot_heatmap(matrix: pd.DataFrame) -> Figure:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, max(3, 0.3 * len(matrix) + 1)))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    image = ax.imshow(matrix.to_numpy(), aspect="auto", cmap="Blues")
+    ax.set_xticks(range(len(matrix.columns)))
+    ax.set_xticklabels(matrix.columns, fontsize=8, rotation=45)
+    ax.set_yticks(range(len(matrix.index)))
+    ax.set_yticklabels(matrix.index, fontsize=8)
+    ax.set_xlabel("Frequency of Bookings", fontsize=9)
+    ax.set_ylabel("Period", fontsize=9)
+    fig.colorbar(image, ax=ax, label="Number of Students")
+    fig.tight_layout()
+    return fig
+
+def heatmap_chart(matrix: pd.DataFrame) -> alt.Chart:
+    import altair as alt
+
+    cells = matrix.reset_index().melt(id_vars="Period", var_name="Freq", value_name="Students")
+    return alt.Chart(cells).mark_rect().encode(
+        x=alt.X("Freq:O", sort=list(matrix.columns), title="Frequency of Bookings",
+                axis=alt.Axis(labelAngle=-45)),
+        y=alt.Y("Period:O", title="Period"),
+        color=alt.Color("Students:Q", scale=alt.Scale(scheme="blues"), title="Number of Students"),
+        tooltip=["Period:O", "Freq:O", "Students:Q"],
+    )
+
+@functools.cache
+def get_chart_cache():
+    return LRUCache(CHART_CACHE_MAX_ENTRIES, sizeof=len)
+
+def render_histogram_png(table: pd.DataFrame, dpi: int = CHART_DPI) -> bytes:
+    key = content_digest(
+        table["#Students"].to_numpy(dtype=np.int64).tobytes(),
+        freq=tuple(table["Freq"].astype(str)),
+        stats=tuple(sorted(table.attrs.get("stats", {}).items())),
+        dpi=dpi,
+    )
+    cache = get_chart_cache()
+    png = cache.get(key)
+    if png is None:
+        fig = plot_histogram(table)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+        fig.clear()
+        png = buffer.getvalue()
+        cache.put(key, png)
+    return png
@@ -0,0 +1,222 @@
+"""A persistent, month-partitioned booking dataset that grows by incremental appends.
+
+Each month is stored as one Parquet partition of bookings plus a small
+per-month aggregate (bookings per person and class). Appending an export only
+rewrites the months it adds rows to; reports run on the concatenated
+aggregates, which BookingCube accepts in place of raw bookings.
+"""
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from bookings import (CACHE_VERSION, REQUIRED_COLUMNS, LoadError, compact_strings,
+                      content_digest, get_parse_cache, month_label)
+from perf import StageTimer
+
+DATASET_DIR = os.environ.get("FRQ_DATASET_DIR", ".frq_dataset")
+BOOKING_KEY = ["Id_Person", "Start_Date_time", "Class_Name"]
+UNDATED = "undated"
+
+def partition_name(month_key: int) -> str:
+    return month_label(month_key) if month_key >= 0 else UNDATED
+
+def storage_frame(data: pd.DataFrame) -> pd.DataFrame:
+    data = data[REQUIRED_COLUMNS].copy()
+    for column in ["Class_Name", "FirstName", "Id_Person"]:
+        if isinstance(data[column].dtype, pd.CategoricalDtype):
+            data[column] = data[column].astype(data[column].cat.categories.dtype)
+    data.attrs = {}
+    return data
+
+def id_type(ids: pd.Series) -> str:
+    return "number" if pd.api.types.is_numeric_dtype(ids) else "string"
+
+def coerce_ids(ids: pd.Series, stored_type: str | None) -> pd.Series:
+    if isinstance(ids.dtype, pd.CategoricalDtype):
+        ids = ids.astype(ids.cat.categories.dtype)
+    if stored_type is None or id_type(ids) == stored_type:
+        return ids
+    if stored_type == "string":
+        return ids.astype("string")
+    numbers = pd.to_numeric(ids, errors="coerce")
+    invalid = numbers.isna() & ids.notna()
+    if invalid.any():
+        raise LoadError(f"Id_Person values such as {ids[invalid].iloc[0]!r} are not numeric, "
+                        "but the dataset stores numeric ids")
+    return numbers
+
+def occurrence(data: pd.DataFrame) -> pd.Series:
+    return data.groupby(BOOKING_KEY, sort=False, dropna=False).cumcount()
+
+def monthly_aggregate(data: pd.DataFrame, month_key: int) -> pd.DataFrame:
+    aggregate = (data.groupby(["Id_Person", "Class_Name"], sort=False, dropna=False)
+                 .agg(FirstName=("FirstName", "first"), Bookings=("FirstName", "size"))
+                 .reset_index())
+    aggregate["Month_Key"] = month_key
+    return aggregate
+
+class BookingDataset:
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory: str = DATASET_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    def _read_manifest(self):
+        try:
+            with open(self._path(self.MANIFEST)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {"partitions": {}, "sources": {}}
+
+    def _write_manifest(self, manifest):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".json")
+        with os.fdopen(fd, "w") as fh:
+            json.dump(manifest, fh)
+        os.replace(tmp, self._path(self.MANIFEST))
+
+    def _stage_parquet(self, data, kind, name, staged):
+        os.makedirs(self._path(kind), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._path(kind), suffix=".tmp")
+        os.close(fd)
+        staged.append((tmp, self._path(kind, f"{name}.parquet")))
+        data.to_parquet(tmp, index=False)
+        with open(tmp, "rb") as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+
+    def _id_type(self, manifest):
+        if "id_type" not in manifest and manifest["partitions"]:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            name = next(iter(manifest["partitions"]))
+            schema = pq.read_schema(self._path("bookings", f"{name}.parquet"))
+            field = schema.field("Id_Person").type
+            numeric = pa.types.is_integer(field) or pa.types.is_floating(field)
+            manifest["id_type"] = "number" if numeric else "string"
+        return manifest.get("id_type")
+
+    def append(self, data: pd.DataFrame, timer: StageTimer | None = None) -> dict:
+        timer = timer or StageTimer(enabled=False)
+        source = data.attrs.get("digest")
+        staged = []
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                manifest = self._read_manifest()
+                if source is not None and source in manifest["sources"]:
+                    return dict(manifest["sources"][source], skipped=True)
+                ids = coerce_ids(data["Id_Person"], self._id_type(manifest))
+                summary = {"rows": len(data), "added": 0, "duplicates": 0, "months": []}
+                partitions = {}
+                data = data.assign(Id_Person=ids)
+                for month_key, rows in data.groupby("Month_Key", sort=True):
+                    name = partition_name(int(month_key))
+                    with timer.stage(f"  append {name}", rows=len(rows)):
+                        added, partitions[name] = self._stage_month(
+                            manifest, name, int(month_key), storage_frame(rows), staged)
+                    summary["added"] += added
+                    summary["duplicates"] += len(rows) - added
+                    if added:
+                        summary["months"].append(name)
+                # Only swap partitions in once every touched month has been written.
+                for tmp, path in staged:
+                    os.replace(tmp, path)
+                staged = []
+                manifest["partitions"].update(
+                    (name, entry) for name, entry in partitions.items() if entry is not None)
+                manifest["id_type"] = manifest.get("id_type") or id_type(ids)
+                if source is not None:
+                    manifest["sources"][source] = summary
+                self._write_manifest(manifest)
+            except LoadError:
+                raise
+            except Exception as e:
+                raise LoadError(f"Could not append to the dataset: {e}") from e
+            finally:
+                for tmp, _ in staged:
+                    with contextlib.suppress(OSError):
+                        os.remove(tmp)
+        return summary
+
+    def _stage_month(self, manifest, name, month_key, new, staged):
+        if name in manifest["partitions"]:
+            existing = pd.read_parquet(self._path("bookings", f"{name}.parquet"))
+        else:
+            existing = new.iloc[:0]
+        # There is no booking id, so identical rows are separate bookings: the n-th copy
+        # of a key in the upload is new only if fewer than n are stored.
+        keys = pd.concat([existing[BOOKING_KEY].assign(copy=occurrence(existing)),
+                          new[BOOKING_KEY].assign(copy=occurrence(new))],
+                         ignore_index=True)
+        fresh = ~keys.duplicated().to_numpy()[len(existing):]
+        added = int(fresh.sum())
+        if not added:
+            return 0, None
+        combined = pd.concat([existing, new[fresh]], ignore_index=True)
+        entry = {
+            "month": month_key,
+            "rows": len(combined),
+            "digest": self._stage_parquet(combined, "bookings", name, staged),
+            "updated": time.time(),
+        }
+        self._stage_parquet(monthly_aggregate(combined, month_key), "aggregates", name, staged)
+        return added, entry
+
+    def digest(self, manifest=None) -> str:
+        manifest = manifest or self._read_manifest()
+        partitions = [(name, entry["digest"]) for name, entry in sorted(manifest["partitions"].items())]
+        return content_digest(repr(partitions).encode(), version=CACHE_VERSION)
+
+    def aggregates(self) -> pd.DataFrame:
+        manifest = self._read_manifest()
+        key = self.digest(manifest)
+        cache = get_parse_cache()
+        data = cache.get(key)
+        if data is not None:
+            return data
+        parts = [pd.read_parquet(self._path("aggregates", f"{name}.parquet"))
+                 for name in sorted(manifest["partitions"])]
+        if not parts:
+            return pd.DataFrame(columns=["Id_Person", "Class_Name", "FirstName", "Bookings",
+                                         "Month_Key"])
+        data = pd.concat(parts, ignore_index=True)
+        data["Class_Name"] = data["Class_Name"].astype("string").astype("category")
+        data["FirstName"] = compact_strings(data["FirstName"])
+        data["Month_Key"] = data["Month_Key"].astype("int16")
+        data.attrs["digest"] = key
+        data.attrs["months"] = sorted(entry["month"] for entry in manifest["partitions"].values()
+                                      if entry["month"] >= 0)
+        data.attrs["load_info"] = {
+            "source": "dataset",
+            "directory": self.directory,
+            "partitions": len(parts),
+            "bookings": sum(entry["rows"] for entry in manifest["partitions"].values()),
+        }
+        cache.put(key, data)
+        return data
+
+    def stats(self) -> dict:
+        manifest = self._read_manifest()
+        return {
+            "directory": self.directory,
+            "partitions": len(manifest["partitions"]),
+            "bookings": sum(entry["rows"] for entry in manifest["partitions"].values()),
+            "sources": len(manifest["sources"]),
+        }
+
+@functools.cache
+def get_dataset():
+    return BookingDataset(DATASET_DIR)
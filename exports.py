@@ -0,0 +1,81 @@
+"""Streaming CSV/XLSX export of frequency tables and per-student lists."""
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Callable, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from bookings import count_bookings
+
+EXPORT_CHUNK_ROWS = 10_000
+EXCEL_MAX_ROWS = 1_048_576
+STUDENT_HEADER = ["Id_Person", "FirstName", "Bookings", "Freq"]
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+def table_rows(table: pd.DataFrame) -> Iterator[tuple]:
+    return table.itertuples(index=False, name=None)
+
+def student_rows(students: pd.DataFrame, max_upper: int,
+                 chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[tuple]:
+    overflow = f">{max_upper}"
+    for start in range(0, len(students), chunk_rows):
+        chunk = students.iloc[start:start + chunk_rows]
+        bookings = chunk["Bookings"].to_numpy()
+        freqs = np.where(bookings > max_upper, overflow, bookings.astype(str))
+        yield from zip(chunk["Id_Person"].tolist(), chunk["FirstName"].tolist(),
+                       bookings.tolist(), freqs.tolist())
+
+def write_csv(header: list[str], rows: Iterable[tuple], fh, sheet_title: str = ""):
+    text = io.TextIOWrapper(fh, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text)
+    writer.writerow(header)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+def write_xlsx(header: list[str], rows: Iterable[tuple], fh, sheet_title: str = "Sheet"):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = EXCEL_MAX_ROWS
+    for row in rows:
+        if sheet_rows >= EXCEL_MAX_ROWS:
+            sheet = workbook.create_sheet(f"{sheet_title} {len(workbook.worksheets) + 1}"
+                                          if workbook.worksheets else sheet_title)
+            sheet.append(header)
+            sheet_rows = 1
+        sheet.append(row)
+        sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet(sheet_title).append(header)
+    workbook.save(fh)
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+def export_file(fmt: str, header: list[str], rows: Iterable[tuple],
+                sheet_title: str = "Sheet") -> bytes:
+    # st.download_button keeps the whole export in memory anyway, so build it in a
+    # BytesIO. Write straight to disk (batch_report.py --students) for exports too
+    # large for that.
+    fh = io.BytesIO()
+    WRITERS[fmt](header, rows, fh, sheet_title=sheet_title)
+    return fh.getvalue()
+
+def table_download(table: pd.DataFrame, fmt: str) -> Callable[[], bytes]:
+    return lambda: export_file(fmt, list(table.columns), table_rows(table),
+                               sheet_title="Frequency")
+
+def students_download(data: pd.DataFrame, selection: dict, exclusions: Iterable[str],
+                      max_upper: int, fmt: str) -> Callable[[], bytes]:
+    return lambda: export_file(
+        fmt, STUDENT_HEADER,
+        student_rows(count_bookings(data, exclusions=exclusions, **selection), max_upper),
+        sheet_title="Students",
+    )
@@ -0,0 +1,72 @@
+"""Opt-in wall-time and memory instrumentation for the report's hot path."""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger("frq.perf")
+
+def configure_log_sink(path: str | None = None):
+    if logger.handlers:
+        return
+    handler = logging.FileHandler(path) if path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+class StageTimer:
+    def __init__(self, enabled: bool = True, log: bool = False):
+        self.enabled = enabled
+        self.log = log
+        self.records: list[dict] = []
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None):
+        record = {"stage": name, "rows": rows}
+        if not self.enabled:
+            yield record
+            return
+        memory_before = rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["memory_delta_bytes"] = rss_bytes() - memory_before
+            self._append(record)
+
+    def add(self, name: str, seconds: float, rows: int | None = None):
+        if self.enabled:
+            self._append({"stage": name, "rows": rows, "seconds": seconds,
+                          "memory_delta_bytes": None})
+
+    def _append(self, record: dict):
+        self.records.append(record)
+        if self.log:
+            logger.info("%s: %.4f s, rows=%s, rss %+d bytes", record["stage"], record["seconds"],
+                        record["rows"], record["memory_delta_bytes"] or 0)
+
+    def frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame(self.records, columns=["stage", "rows", "seconds", "memory_delta_bytes"])
+        frame["ms"] = (frame["seconds"] * 1000).round(2)
+        frame["memory_delta_mb"] = (frame["memory_delta_bytes"] / 2 ** 20).round(2)
+        return frame[["stage", "ms", "rows", "memory_delta_mb"]]